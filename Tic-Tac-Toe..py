@@ -23,7 +23,21 @@ Fun Level: 10/10 would code again!
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import mmap
+import os
 import random
+import struct
+import sys
+
+try:
+    import numpy as np  # Only needed to build tablebases with solve_retrograde
+except ImportError:
+    np = None
+
+try:
+    from multiprocessing import resource_tracker, shared_memory  # Python 3.8+
+except ImportError:
+    shared_memory = None
 
 
 class TicTacToe:
@@ -38,17 +52,65 @@ class TicTacToe:
     3 | 4 | 5
     ---------
     6 | 7 | 8
+    
+    Bigger boards (e.g. 4x4) use the same row-by-row numbering, and a
+    player wins by filling a whole row, column or diagonal.
     """
     
-    def __init__(self):
-        """Initialize a new game with empty board."""
-        self.board = [' ' for _ in range(9)]  # Empty 3x3 board
+    def __init__(self, size=3, candidate_radius=None):
+        """Initialize a new game with empty board.
+        
+        Args:
+            size (int): Board width/height (3 for the classic game, 4 for 4x4)
+            candidate_radius (int): Only consider empty squares within this
+                many rows/columns of a stone when searching (None = all squares)
+        """
+        self.size = size
+        self.board = [' ' for _ in range(size * size)]  # Empty size x size board
         self.current_winner = None  # Track who won (X, O, or None)
         
+        if candidate_radius is not None and candidate_radius < 1:
+            raise ValueError("candidate_radius must be at least 1 (or None)")
+            
+        # Squares within candidate_radius of each square (itself excluded)
+        self.candidate_radius = candidate_radius
+        self.neighbors = []
+        if candidate_radius is not None:
+            for square in range(size * size):
+                row, col = divmod(square, size)
+                rows = range(max(0, row - candidate_radius), min(size, row + candidate_radius + 1))
+                cols = range(max(0, col - candidate_radius), min(size, col + candidate_radius + 1))
+                self.neighbors.append([r * size + c for r in rows for c in cols
+                                       if (r, c) != (row, col)])
+        self.reset_candidates()
+        
+    def reset_candidates(self):
+        """Clear the candidate move tracking for an empty board."""
+        self.stones = 0
+        self.nearby_stones = [0] * len(self.board)  # Stones within the radius
+        self.candidates = set()  # Empty squares with a stone nearby
+        
     def available_moves(self):
         """Get list of available positions where players can make moves."""
         return [i for i, spot in enumerate(self.board) if spot == ' ']
     
+    def candidate_moves(self):
+        """
+        Get the moves worth searching: empty squares near existing stones.
+        
+        On big boards most empty squares are far from the action, so the
+        AI players only look at squares within candidate_radius of a stone.
+        The set is kept up to date by make_move and undo_move. Falls back to
+        every empty square when candidate_radius is None or the board is
+        empty.
+        
+        Returns:
+            list: Candidate positions in ascending order
+        """
+        if self.candidate_radius is None or self.stones == 0:
+            return self.available_moves()
+        return sorted(self.candidates)
+    
     def empty_squares(self):
         """Check if there are any empty squares left on the board."""
         return ' ' in self.board
@@ -73,9 +135,37 @@ class TicTacToe:
             # Check if this move resulted in a win
             if self.winner(square, letter):
                 self.current_winner = letter
+            # Squares around the new stone become candidates
+            if self.candidate_radius is not None:
+                self.stones += 1
+                self.candidates.discard(square)
+                for nb in self.neighbors[square]:
+                    self.nearby_stones[nb] += 1
+                    if self.board[nb] == ' ':
+                        self.candidates.add(nb)
             return True
         return False
     
+    def undo_move(self, square):
+        """
+        Take back the move at a square (used by the AI while searching).
+        
+        Args:
+            square (int): Position of the move to undo (0 to size*size - 1)
+        """
+        if self.board[square] == ' ':
+            return  # Nothing to undo
+        self.board[square] = ' '
+        self.current_winner = None
+        if self.candidate_radius is not None:
+            self.stones -= 1
+            for nb in self.neighbors[square]:
+                self.nearby_stones[nb] -= 1
+                if self.nearby_stones[nb] == 0:
+                    self.candidates.discard(nb)
+            if self.nearby_stones[square] > 0:
+                self.candidates.add(square)
+    
     def winner(self, square, letter):
         """
         Check if the last move resulted in a win.
@@ -87,34 +177,38 @@ class TicTacToe:
         Returns:
             bool: True if this move wins the game
         """
+        n = self.size
+        
         # Check the row of the last move
-        row_ind = square // 3
-        row = self.board[row_ind*3:(row_ind+1)*3]
+        row_ind = square // n
+        row = self.board[row_ind*n:(row_ind+1)*n]
         if all([spot == letter for spot in row]):
             return True
             
         # Check the column of the last move
-        col_ind = square % 3
-        column = [self.board[col_ind+i*3] for i in range(3)]
+        col_ind = square % n
+        column = [self.board[col_ind+i*n] for i in range(n)]
         if all([spot == letter for spot in column]):
             return True
             
         # Check diagonals (only if move was on a diagonal position)
-        if square % 2 == 0:  # Corner or center positions
+        if row_ind == col_ind:
             # Main diagonal (top-left to bottom-right)
-            diagonal1 = [self.board[i] for i in [0, 4, 8]]
+            diagonal1 = [self.board[i*(n+1)] for i in range(n)]
             if all([spot == letter for spot in diagonal1]):
                 return True
+        if row_ind + col_ind == n - 1:
             # Anti-diagonal (top-right to bottom-left)
-            diagonal2 = [self.board[i] for i in [2, 4, 6]]
+            diagonal2 = [self.board[(i+1)*(n-1)] for i in range(n)]
             if all([spot == letter for spot in diagonal2]):
                 return True
         return False
     
     def reset_game(self):
         """Reset the board for a new game."""
-        self.board = [' ' for _ in range(9)]
+        self.board = [' ' for _ in range(self.size * self.size)]
         self.current_winner = None
+        self.reset_candidates()
 
 class RandomComputerPlayer:
     """
@@ -134,15 +228,15 @@ class RandomComputerPlayer:
         
     def get_move(self, game):
         """
-        Choose a random move from available positions.
+        Choose a random move from the candidate positions.
         
         Args:
             game (TicTacToe): Current game state
             
         Returns:
-            int: Random position from available moves
+            int: Random position from candidate moves
         """
-        return random.choice(game.available_moves())
+        return random.choice(game.candidate_moves())
 
 class SmartComputerPlayer:
     """
@@ -152,13 +246,16 @@ class SmartComputerPlayer:
     to evaluate all possible future game states and choose the optimal move.
     """
     
-    def __init__(self, letter):
+    def __init__(self, letter, cache=None):
         """Initialize the smart AI player.
         
         Args:
             letter (str): The symbol this AI uses ('O' typically)
+            cache (SharedPositionCache): Optional cache of solved positions,
+                which can be shared with other processes
         """
         self.letter = letter
+        self.cache = cache
         
     def get_move(self, game):
         """
@@ -171,8 +268,9 @@ class SmartComputerPlayer:
             int: Optimal position to play
         """
         # On first move, choose a corner for better strategy
-        if len(game.available_moves()) == 9:
-            return random.choice([0, 2, 6, 8])  # Corner positions
+        n = game.size
+        if len(game.available_moves()) == n * n:
+            return random.choice([0, n-1, n*(n-1), n*n-1])  # Corner positions
         else:
             # Use minimax to find the best move
             return self.minimax(game, self.letter)['position']
@@ -204,14 +302,21 @@ class SmartComputerPlayer:
             # Game is tied
             return {'position': None, 'score': 0}
             
+        # Reuse a result that any process sharing the cache already found
+        if self.cache is not None:
+            key = position_key(state.board, player, max_player)
+            entry = self.cache.probe(key, state.num_empty_squares())
+            if entry is not None:
+                return {'position': entry[1], 'score': entry[0]}
+            
         # Initialize best move tracking
         if player == max_player:
             best = {'position': None, 'score': -float('inf')}  # Want to maximize
         else:
             best = {'position': None, 'score': float('inf')}   # Want to minimize
             
-        # Try each possible move
-        for possible_move in state.available_moves():
+        # Try each candidate move
+        for possible_move in state.candidate_moves():
             # Make the move temporarily
             state.make_move(possible_move, player)
             
@@ -219,8 +324,7 @@ class SmartComputerPlayer:
             sim_score = self.minimax(state, other_player)
             
             # Undo the move
-            state.board[possible_move] = ' '
-            state.current_winner = None
+            state.undo_move(possible_move)
             sim_score['position'] = possible_move
             
             # Update best move if this is better
@@ -230,8 +334,334 @@ class SmartComputerPlayer:
             else:
                 if sim_score['score'] < best['score']:
                     best = sim_score
+                    
+        if self.cache is not None:
+            self.cache.store(key, best['score'], best['position'], state.num_empty_squares())
         return best
 
+# Base-3 digit used for each square when a board is encoded as an integer
+CELL_DIGITS = {' ': 0, 'X': 1, 'O': 2}
+
+# Tablebase bytes hold score + TABLEBASE_OFFSET; 0 means "never solved"
+TABLEBASE_OFFSET = 128
+TABLEBASE_UNSOLVED = 0
+
+
+def board_index(board):
+    """
+    Encode a board as a base-3 integer (square i is digit i).
+    
+    Args:
+        board (list): Board squares (' ', 'X' or 'O')
+        
+    Returns:
+        int: Index of this board in a tablebase (0 to 3**len(board) - 1)
+    """
+    index = 0
+    for spot in reversed(board):
+        index = index * 3 + CELL_DIGITS[spot]
+    return index
+
+
+def winning_lines(size):
+    """List every row, column and diagonal of a size x size board."""
+    lines = [[row * size + col for col in range(size)] for row in range(size)]
+    lines += [[row * size + col for row in range(size)] for col in range(size)]
+    lines.append([i * (size + 1) for i in range(size)])
+    lines.append([(i + 1) * (size - 1) for i in range(size)])
+    return lines
+
+
+def solve_retrograde(path, size=4, chunk_size=1 << 18):
+    """
+    Solve every legal position of a size x size board by backward induction.
+    
+    Positions are grouped into levels by the number of stones on the board.
+    Full boards are solved first, then each level is computed from the one
+    after it using NumPy on whole batches of positions at a time. Results
+    are written to a memory-mapped file with one byte per base-3 index
+    (3**16 bytes, about 43 MB, for 4x4), so the table never has to fit in
+    a Python dict.
+    
+    Each byte holds TABLEBASE_OFFSET plus the score for the player to move,
+    using the same scale as SmartComputerPlayer.minimax: a win is worth
+    (empty squares + 1), a loss the negative of that and a tie 0.
+    
+    Args:
+        path (str): File to write the tablebase to
+        size (int): Board width/height
+        chunk_size (int): Positions processed per NumPy batch
+    """
+    if np is None:
+        raise ImportError("solve_retrograde needs NumPy (pip install numpy)")
+        
+    cells = size * size
+    num_states = 3 ** cells
+    powers = 3 ** np.arange(cells, dtype=np.int64)
+    lines = np.array(winning_lines(size))
+    
+    # Pass 1: stone count of every legal board (X moves first, so X has as
+    # many stones as O or one more). 255 marks boards that can't happen.
+    levels = np.full(num_states, 255, dtype=np.uint8)
+    for start in range(0, num_states, chunk_size):
+        stop = min(start + chunk_size, num_states)
+        digits = (np.arange(start, stop, dtype=np.int64)[:, None] // powers) % 3
+        x_count = (digits == 1).sum(axis=1)
+        o_count = (digits == 2).sum(axis=1)
+        legal = (x_count == o_count) | (x_count == o_count + 1)
+        levels[start:stop][legal] = (x_count + o_count)[legal]
+        
+    # Pass 2: solve levels from full boards back to the empty board
+    table = np.memmap(path, dtype=np.uint8, mode='w+', shape=(num_states,))
+    for level in range(cells, -1, -1):
+        indices = np.flatnonzero(levels == level)
+        mover = 1 if level % 2 == 0 else 2  # Digit of the player to move
+        lost = -(cells - level + 1)  # Score when the last move won
+        
+        for start in range(0, len(indices), chunk_size):
+            batch = indices[start:start + chunk_size].astype(np.int64)
+            digits = (batch[:, None] // powers) % 3
+            line_digits = digits[:, lines]
+            finished = ((line_digits == 1).all(axis=2) |
+                        (line_digits == 2).all(axis=2)).any(axis=1)
+            
+            # Full boards without a line are ties; otherwise try each move
+            best = np.full(len(batch), 0 if level == cells else -127, dtype=np.int16)
+            for square in range(cells):
+                free = ~finished & (digits[:, square] == 0)
+                if not free.any():
+                    continue
+                children = batch[free] + mover * powers[square]
+                # The child's score is for the opponent, so negate it
+                scores = TABLEBASE_OFFSET - table[children].astype(np.int16)
+                best[free] = np.maximum(best[free], scores)
+                
+            best[finished] = lost
+            table[batch] = best + TABLEBASE_OFFSET
+            
+    table.flush()
+    del table
+
+
+class TablebaseComputerPlayer:
+    """
+    Perfect AI that reads its moves from a solved tablebase file.
+    
+    The file written by solve_retrograde is memory-mapped, so only the
+    pages holding the positions we actually look at are read from disk.
+    Works as a drop-in replacement for SmartComputerPlayer on any board
+    size the tablebase was built for.
+    """
+    
+    def __init__(self, letter, path):
+        """Initialize the tablebase AI player.
+        
+        Args:
+            letter (str): The symbol this AI uses ('O' typically)
+            path (str): Tablebase file created by solve_retrograde
+        """
+        self.letter = letter
+        with open(path, 'rb') as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+    def get_move(self, game):
+        """
+        Choose the best possible move by looking up every child position.
+        
+        Args:
+            game (TicTacToe): Current game state
+            
+        Returns:
+            int: Optimal position to play
+        """
+        if len(self.table) != 3 ** len(game.board):
+            raise ValueError("Tablebase was built for a different board size")
+            
+        index = board_index(game.board)
+        digit = CELL_DIGITS[self.letter]
+        best = {'position': None, 'score': -float('inf')}
+        for possible_move in game.available_moves():
+            value = self.table[index + digit * 3 ** possible_move]
+            if value == TABLEBASE_UNSOLVED:
+                raise ValueError("Position is not in the tablebase (wrong turn?)")
+            # Stored scores are for the opponent, who moves next
+            score = TABLEBASE_OFFSET - value
+            if score > best['score']:
+                best = {'position': possible_move, 'score': score}
+        return best['position']
+    
+    def close(self):
+        """Release the memory-mapped tablebase."""
+        self.table.close()
+
+# Shared cache layout: a header (magic, bucket count, counters) followed by
+# buckets of two (key XOR data, data) entries
+CACHE_MAGIC = b'TTTCACHE'
+CACHE_COUNTERS = ('probes', 'hits', 'foreign_hits', 'stores', 'replacements')
+CACHE_HEADER = struct.Struct('<8sQ5Q')
+CACHE_COUNTER = struct.Struct('<Q')
+CACHE_ENTRY = struct.Struct('<QQ')
+CACHE_BUCKET_SIZE = 2 * CACHE_ENTRY.size
+
+
+def position_key(board, player, max_player):
+    """
+    Build the 64-bit cache key for a minimax position.
+    
+    Minimax scores depend on whose turn it is and on which player is
+    maximizing, so both are part of the key. The board size is too, since
+    e.g. empty 3x3 and 4x4 boards have the same board_index. The top bit
+    is always set so no key is 0, which is what an empty cache slot holds.
+    
+    Args:
+        board (list): Board squares (' ', 'X' or 'O')
+        player (str): Player to move
+        max_player (str): Player the scores are for
+        
+    Returns:
+        int: Key for SharedPositionCache
+    """
+    key = board_index(board) * 4 + (player == 'O') * 2 + (max_player == 'O')
+    key = key * 32 + round(len(board) ** 0.5)  # Board width
+    return key % ((1 << 61) - 1) | (1 << 63)
+
+
+class SharedPositionCache:
+    """
+    Fixed-size table of solved positions that several processes can share.
+    
+    The table lives in multiprocessing.shared_memory, so a GUI and any
+    number of batch jobs or server workers can reuse each other's minimax
+    results instead of solving the same positions again. Processes sharing
+    a cache should use the same board settings.
+    
+    There are no locks. Each entry stores (key XOR data) next to the data,
+    so if two processes write the same slot at once the torn entry fails
+    the key check and just reads as a miss.
+    
+    Every bucket has two slots: the first keeps the result of the deepest
+    search, the second is always overwritten so new results are never lost.
+    Usage counters live in shared memory as well; they are updated without
+    a lock, so under heavy contention they may undercount a little.
+    """
+    
+    def __init__(self, name=None, num_buckets=1 << 16, create=True):
+        """Create a new cache or attach to an existing one.
+        
+        Args:
+            name (str): Shared memory name (picked at random if None)
+            num_buckets (int): Number of two-slot buckets for a new cache
+            create (bool): False to attach to the existing cache called name
+        """
+        if shared_memory is None:
+            raise ImportError("SharedPositionCache needs Python 3.8+")
+            
+        kwargs = {}
+        if sys.version_info >= (3, 13):
+            kwargs['track'] = create  # Only the creator cleans the block up
+            
+        if create:
+            size = CACHE_HEADER.size + num_buckets * CACHE_BUCKET_SIZE
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size, **kwargs)
+            CACHE_HEADER.pack_into(self.shm.buf, 0, CACHE_MAGIC, num_buckets, 0, 0, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name, **kwargs)
+            if sys.version_info < (3, 13) and os.name == 'posix':
+                # Older Pythons track attached blocks too and delete them when
+                # this process exits, pulling the cache away from everyone else
+                # (there is no tracker for shared memory on Windows)
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            magic, num_buckets = CACHE_HEADER.unpack_from(self.shm.buf, 0)[:2]
+            if magic != CACHE_MAGIC:
+                self.shm.close()
+                raise ValueError(f"Shared memory {name!r} is not a position cache")
+                
+        self.name = self.shm.name
+        self.num_buckets = num_buckets
+        self.local_stats = dict.fromkeys(CACHE_COUNTERS, 0)
+        
+    def probe(self, key, depth=0):
+        """
+        Look a position up.
+        
+        Args:
+            key (int): Key from position_key
+            depth (int): Minimum search depth the stored result needs
+            
+        Returns:
+            tuple: (score, best move, depth), or None on a miss
+        """
+        self._count('probes')
+        offset = self._bucket(key)
+        for slot in range(2):
+            check, data = CACHE_ENTRY.unpack_from(self.shm.buf, offset + slot * CACHE_ENTRY.size)
+            if check ^ data == key and (data >> 32) & 0xFF >= depth:
+                self._count('hits')
+                if data >> 40 != self._owner():
+                    self._count('foreign_hits')  # Work another process did for us
+                score = data & 0xFFFF
+                if score >= 0x8000:
+                    score -= 0x10000
+                move = ((data >> 16) & 0xFFFF) - 1
+                return score, (None if move < 0 else move), (data >> 32) & 0xFF
+        return None
+    
+    def store(self, key, score, move, depth):
+        """
+        Save a solved position.
+        
+        Args:
+            key (int): Key from position_key
+            score (int): Minimax score of the position
+            move (int): Best move, or None
+            depth (int): How many moves deep the search looked
+        """
+        offset = self._bucket(key)
+        check, data = CACHE_ENTRY.unpack_from(self.shm.buf, offset)
+        if depth < (data >> 32) & 0xFF:
+            # Keep the deeper result and use the always-replace slot
+            offset += CACHE_ENTRY.size
+            check, data = CACHE_ENTRY.unpack_from(self.shm.buf, offset)
+        if check ^ data not in (0, key):
+            self._count('replacements')
+            
+        data = ((score & 0xFFFF) | ((0 if move is None else move + 1) << 16) |
+                (depth << 32) | (self._owner() << 40))
+        CACHE_ENTRY.pack_into(self.shm.buf, offset, key ^ data, data)
+        self._count('stores')
+        
+    def stats(self):
+        """Get the usage counters summed over every process using the cache."""
+        return dict(zip(CACHE_COUNTERS, CACHE_HEADER.unpack_from(self.shm.buf, 0)[2:]))
+    
+    def close(self):
+        """Detach this process from the cache."""
+        self.shm.close()
+        
+    def unlink(self):
+        """Destroy the cache (call once, from the process that created it)."""
+        if sys.version_info < (3, 13) and os.name == 'posix':
+            # An attach in this process (or a forked child sharing our
+            # tracker) may have unregistered the block; unlink expects it
+            resource_tracker.register(self.shm._name, 'shared_memory')
+        self.shm.unlink()
+        
+    def _owner(self):
+        """Get the ID that tags entries written by the current process."""
+        return os.getpid() & 0xFFFFFF  # Looked up each time so forks differ
+    
+    def _bucket(self, key):
+        """Get the byte offset of the bucket for a key."""
+        return CACHE_HEADER.size + (key % self.num_buckets) * CACHE_BUCKET_SIZE
+    
+    def _count(self, counter):
+        """Add one to a local and a shared usage counter."""
+        self.local_stats[counter] += 1
+        offset = 16 + CACHE_COUNTERS.index(counter) * CACHE_COUNTER.size
+        value, = CACHE_COUNTER.unpack_from(self.shm.buf, offset)
+        CACHE_COUNTER.pack_into(self.shm.buf, offset, value + 1)
+
+
 class TicTacToeGUI:
     """
     Modern GUI for Tic-Tac-Toe game.
@@ -7,14 +7,22 @@ Tests for TicTacToe class and AI players to ensure correct functionality.
 """
 
 import unittest
+from unittest import mock
 import sys
 import os
+import multiprocessing
+import random
+import subprocess
+import tempfile
 
 # Add parent directory to path to import game modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from TicTacToe import TicTacToe, RandomComputerPlayer, SmartComputerPlayer
+    from TicTacToe import TablebaseComputerPlayer, board_index, solve_retrograde
+    from TicTacToe import np, TABLEBASE_OFFSET
+    from TicTacToe import SharedPositionCache, position_key
 except ImportError:
     # Handle different file naming
     import importlib.util
@@ -24,6 +32,13 @@ except ImportError:
     TicTacToe = game_module.TicTacToe
     RandomComputerPlayer = game_module.RandomComputerPlayer
     SmartComputerPlayer = game_module.SmartComputerPlayer
+    TablebaseComputerPlayer = game_module.TablebaseComputerPlayer
+    board_index = game_module.board_index
+    solve_retrograde = game_module.solve_retrograde
+    np = game_module.np
+    TABLEBASE_OFFSET = game_module.TABLEBASE_OFFSET
+    SharedPositionCache = game_module.SharedPositionCache
+    position_key = game_module.position_key
 
 
 class TestTicTacToeGame(unittest.TestCase):
@@ -84,6 +99,83 @@ class TestTicTacToeGame(unittest.TestCase):
         self.game.make_move(4, 'X')
         self.assertTrue(self.game.make_move(8, 'X'))
         self.assertEqual(self.game.current_winner, 'X')
+    
+    def test_4x4_win(self):
+        """Test that 4x4 boards need a full line of four."""
+        game = TicTacToe(size=4)
+        self.assertEqual(game.available_moves(), list(range(16)))
+        for square in [3, 6, 9]:
+            game.make_move(square, 'O')
+        self.assertIsNone(game.current_winner)
+        game.make_move(12, 'O')  # Completes the anti-diagonal
+        self.assertEqual(game.current_winner, 'O')
+    
+    def test_undo_move(self):
+        """Test undoing a winning move clears the square and winner."""
+        self.game.make_move(0, 'X')
+        self.game.make_move(1, 'X')
+        self.game.make_move(2, 'X')
+        self.game.undo_move(2)
+        self.assertEqual(self.game.board[2], ' ')
+        self.assertIsNone(self.game.current_winner)
+
+
+class TestCandidateMoves(unittest.TestCase):
+    """Test cases for neighborhood move generation on big boards."""
+    
+    def setUp(self):
+        """Set up a 15x15 board that only searches near stones."""
+        self.game = TicTacToe(size=15, candidate_radius=1)
+    
+    def test_empty_board_uses_all_moves(self):
+        """Test that an empty board falls back to every square."""
+        self.assertEqual(self.game.candidate_moves(), list(range(225)))
+    
+    def test_candidates_surround_stones(self):
+        """Test candidates are the empty squares next to stones."""
+        self.game.make_move(0, 'X')  # Top-left corner
+        self.assertEqual(self.game.candidate_moves(), [1, 15, 16])
+        self.game.make_move(112, 'O')  # Center
+        self.assertEqual(self.game.candidate_moves(),
+                         [1, 15, 16, 96, 97, 98, 111, 113, 126, 127, 128])
+    
+    def test_undo_restores_candidates(self):
+        """Test make/undo keeps the candidate set in sync with the board."""
+        moves = random.Random(27).sample(range(225), 30)
+        for i, square in enumerate(moves):
+            self.game.make_move(square, 'XO'[i % 2])
+        for square in reversed(moves[10:]):
+            self.game.undo_move(square)
+            
+        expected = TicTacToe(size=15, candidate_radius=1)
+        for i, square in enumerate(moves[:10]):
+            expected.make_move(square, 'XO'[i % 2])
+        self.assertEqual(self.game.candidate_moves(), expected.candidate_moves())
+    
+    def test_undo_empty_square(self):
+        """Test undoing an empty square leaves the candidates alone."""
+        self.game.make_move(0, 'X')
+        self.game.undo_move(200)
+        self.assertEqual(self.game.candidate_moves(), [1, 15, 16])
+        self.game.undo_move(0)
+        self.assertEqual(self.game.candidate_moves(), list(range(225)))
+    
+    def test_invalid_radius(self):
+        """Test that a radius below 1 is rejected."""
+        with self.assertRaises(ValueError):
+            TicTacToe(size=15, candidate_radius=0)
+    
+    def test_no_radius_uses_all_moves(self):
+        """Test candidate_radius=None gives the full move list."""
+        game = TicTacToe(size=15)
+        game.make_move(0, 'X')
+        self.assertEqual(game.candidate_moves(), game.available_moves())
+    
+    def test_random_ai_plays_near_stones(self):
+        """Test the easy AI picks from the candidate squares."""
+        self.game.make_move(112, 'X')
+        move = RandomComputerPlayer('O').get_move(self.game)
+        self.assertIn(move, [96, 97, 98, 111, 113, 126, 127, 128])
 
 
 class TestRandomAI(unittest.TestCase):
@@ -144,5 +236,211 @@ class TestSmartAI(unittest.TestCase):
         self.assertIn(move, [0, 2, 6, 8])  # Corner positions
 
 
+@unittest.skipIf(np is None, "NumPy is needed to build tablebases")
+class TestTablebaseAI(unittest.TestCase):
+    """Test cases for solve_retrograde and TablebaseComputerPlayer."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Solve the 3x3 game once for all tests."""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, '3x3.bin')
+        solve_retrograde(cls.path, size=3)
+        
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the tablebase file."""
+        cls.tmpdir.cleanup()
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.game = TicTacToe()
+        self.ai = TablebaseComputerPlayer('O', self.path)
+        
+    def tearDown(self):
+        """Release the memory map."""
+        self.ai.close()
+    
+    def test_scores_match_minimax(self):
+        """Test stored scores agree with minimax on random games."""
+        smart = SmartComputerPlayer('O')
+        rng = random.Random(26)
+        for _ in range(20):
+            self.game.reset_game()
+            self.game.make_move(rng.choice(self.game.available_moves()), 'X')
+            while self.game.empty_squares() and not self.game.current_winner:
+                score = self.ai.table[board_index(self.game.board)] - TABLEBASE_OFFSET
+                self.assertEqual(score, smart.minimax(self.game, 'O')['score'])
+                self.game.make_move(rng.choice(self.game.available_moves()), 'O')
+                if self.game.current_winner or not self.game.empty_squares():
+                    break
+                self.game.make_move(rng.choice(self.game.available_moves()), 'X')
+    
+    def test_ai_blocks_winning_move(self):
+        """Test AI blocks opponent's winning move."""
+        self.game.make_move(0, 'X')
+        self.game.make_move(4, 'O')
+        self.game.make_move(1, 'X')
+        self.assertEqual(self.ai.get_move(self.game), 2)
+    
+    def test_perfect_play_is_a_tie(self):
+        """Test two tablebase players always tie."""
+        ai_x = TablebaseComputerPlayer('X', self.path)
+        players = {'X': ai_x, 'O': self.ai}
+        letter = 'X'
+        while self.game.empty_squares() and not self.game.current_winner:
+            self.game.make_move(players[letter].get_move(self.game), letter)
+            letter = 'O' if letter == 'X' else 'X'
+        ai_x.close()
+        self.assertIsNone(self.game.current_winner)
+    
+    def test_wrong_board_size(self):
+        """Test that a 3x3 tablebase refuses 4x4 games."""
+        with self.assertRaises(ValueError):
+            self.ai.get_move(TicTacToe(size=4))
+
+
+def solve_in_child(cache_name, moves):
+    """Run a cached minimax search in a separate process."""
+    cache = SharedPositionCache(cache_name, create=False)
+    game = TicTacToe()
+    for square, letter in moves:
+        game.make_move(square, letter)
+    SmartComputerPlayer('O', cache).minimax(game, 'O')
+    cache.close()
+
+
+def store_in_child(cache, key):
+    """Store an entry through a cache object inherited from the parent."""
+    cache.store(key, 1, 0, 1)
+
+
+# Attaches to a cache from a fresh interpreter, like an unrelated worker would
+ATTACH_SCRIPT = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("game", sys.argv[1])
+game = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(game)
+cache = game.SharedPositionCache(sys.argv[2], create=False)
+cache.store(int(sys.argv[3]), 4, 2, 7)
+cache.close()
+"""
+
+
+class TestSharedPositionCache(unittest.TestCase):
+    """Test cases for SharedPositionCache."""
+    
+    def setUp(self):
+        """Set up a small cache and a game with one X in the corner."""
+        self.cache = SharedPositionCache(num_buckets=1024)
+        self.game = TicTacToe()
+        self.game.make_move(0, 'X')
+        
+    def tearDown(self):
+        """Destroy the shared memory block."""
+        self.cache.close()
+        self.cache.unlink()
+    
+    def test_store_and_probe(self):
+        """Test entries come back exactly as stored."""
+        key = position_key(self.game.board, 'O', 'O')
+        self.assertIsNone(self.cache.probe(key))
+        self.cache.store(key, -7, None, 8)
+        self.assertEqual(self.cache.probe(key), (-7, None, 8))
+        self.assertIsNone(self.cache.probe(key, depth=9))  # Not searched deep enough
+        self.assertIsNone(self.cache.probe(position_key(self.game.board, 'O', 'X')))
+    
+    def test_board_sizes_do_not_share_keys(self):
+        """Test a 4x4 entry never answers for the matching 3x3 board."""
+        big = TicTacToe(size=4)
+        small = TicTacToe()
+        self.cache.store(position_key(big.board, 'O', 'O'), 0, 5, 16)
+        self.assertIsNone(self.cache.probe(position_key(small.board, 'O', 'O'), 9))
+    
+    def test_replacement_policy(self):
+        """Test the deepest result survives collisions."""
+        cache = SharedPositionCache(num_buckets=1)
+        try:
+            cache.store(1 << 63 | 1, 5, 0, depth=6)
+            cache.store(1 << 63 | 2, 3, 1, depth=2)
+            cache.store(1 << 63 | 3, 1, 2, depth=4)  # Evicts the depth 2 entry
+            self.assertEqual(cache.probe(1 << 63 | 1), (5, 0, 6))
+            self.assertIsNone(cache.probe(1 << 63 | 2))
+            self.assertEqual(cache.probe(1 << 63 | 3), (1, 2, 4))
+            self.assertEqual(cache.stats()['replacements'], 1)
+        finally:
+            cache.close()
+            cache.unlink()
+    
+    def test_cached_minimax_matches_plain_minimax(self):
+        """Test the cache doesn't change minimax results."""
+        expected = SmartComputerPlayer('O').minimax(self.game, 'O')
+        ai = SmartComputerPlayer('O', self.cache)
+        self.assertEqual(ai.minimax(self.game, 'O'), expected)
+        self.assertEqual(ai.minimax(self.game, 'O'), expected)  # From the cache
+        self.assertGreater(self.cache.stats()['hits'], 0)
+        self.assertEqual(self.cache.stats()['foreign_hits'], 0)
+    
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                         "needs the fork start method")
+    def test_shared_between_processes(self):
+        """Test one process reuses positions another process solved."""
+        child = multiprocessing.get_context('fork').Process(
+            target=solve_in_child, args=(self.cache.name, [(0, 'X')]))
+        child.start()
+        child.join()
+        self.assertEqual(child.exitcode, 0)
+        
+        expected = SmartComputerPlayer('O').minimax(self.game, 'O')
+        self.assertEqual(SmartComputerPlayer('O', self.cache).minimax(self.game, 'O'), expected)
+        self.assertEqual(self.cache.local_stats['foreign_hits'], 1)  # Root was already solved
+        self.assertEqual(self.cache.stats()['foreign_hits'], 1)
+    
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                         "needs the fork start method")
+    def test_forked_cache_object_is_foreign(self):
+        """Test a forked child's entries count as another process's work."""
+        key = position_key(self.game.board, 'O', 'O')
+        child = multiprocessing.get_context('fork').Process(
+            target=store_in_child, args=(self.cache, key))
+        child.start()
+        child.join()
+        self.assertEqual(child.exitcode, 0)
+        self.assertEqual(self.cache.probe(key), (1, 0, 1))
+        self.assertEqual(self.cache.local_stats['foreign_hits'], 1)
+    
+    def test_attach_and_unlink_without_resource_tracker(self):
+        """Test Windows, which has no shared memory tracker, never calls it."""
+        module_globals = SharedPositionCache.__init__.__globals__
+        broken = mock.Mock()
+        broken.register.side_effect = ModuleNotFoundError('_posixsubprocess')
+        broken.unregister.side_effect = ModuleNotFoundError('_posixsubprocess')
+        cache = SharedPositionCache(num_buckets=16)
+        with mock.patch.dict(module_globals, {'resource_tracker': broken}), \
+                mock.patch('os.name', 'nt'):
+            other = SharedPositionCache(cache.name, create=False)
+            other.close()
+            cache.close()
+            cache.unlink()
+        broken.register.assert_not_called()
+        broken.unregister.assert_not_called()
+    
+    def test_separate_process_can_attach_and_exit(self):
+        """Test an unrelated process leaving doesn't destroy the cache."""
+        key = position_key(self.game.board, 'O', 'O')
+        game_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'Tic-Tac-Toe..py')
+        result = subprocess.run([sys.executable, '-c', ATTACH_SCRIPT, game_file,
+                                 self.cache.name, str(key)],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn('leaked', result.stderr)
+        
+        other = SharedPositionCache(self.cache.name, create=False)
+        self.assertEqual(other.probe(key), (4, 2, 7))
+        self.assertEqual(other.local_stats['foreign_hits'], 1)
+        other.close()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file